@@ -7,9 +7,13 @@ Calibration is performed in two stages:
 2. Scale calibration - calculates conversion factors using known weights
 """
 
+import math
+import os
 import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 import RPi.GPIO as GPIO
-from hx711 import HX711
+from fast_hx711 import FastHX711
 
 # GPIO Pin Configuration for Four HX711 Modules
 HX711_CONFIGS = [
@@ -22,6 +26,9 @@ HX711_CONFIGS = [
 # Number of samples for averaging
 SAMPLES = 10
 
+# Binary calibration read by the weighing scripts, kept next to them
+CALIBRATION_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'calibration.npy')
+
 def cleanup():
     """Clean up GPIO on exit"""
     GPIO.cleanup()
@@ -30,18 +37,47 @@ def initialize_sensors():
     """Initialize all four HX711 sensors"""
     sensors = []
     for config in HX711_CONFIGS:
-        hx = HX711(dout_pin=config['dout'], pd_sck_pin=config['pd_sck'])
+        hx = FastHX711(dout_pin=config['dout'], pd_sck_pin=config['pd_sck'])
         hx.reset()
         sensors.append({
             'name': config['name'],
             'hx': hx,
             'offset': 0,
-            'scale': 1
+            'scale': 1,
+            'samples': np.empty(SAMPLES)  # Reused by both calibration stages
         })
     return sensors
 
+def collect_samples(sensor):
+    """Fill a sensor's sample buffer and return the number of valid readings"""
+    samples = sensor['samples']
+    count = 0
+
+    for i in range(SAMPLES):
+        # Errors stay with this sensor so the other threads finish their stage
+        try:
+            reading = sensor['hx'].get_raw_data_mean()
+        except Exception as e:
+            print(f"  {sensor['name']} reading {i+1}/{SAMPLES} failed: {e}")
+            reading = False
+        if reading:
+            samples[count] = reading
+            count += 1
+            print(f"  {sensor['name']} reading {i+1}/{SAMPLES}: {reading}")
+        time.sleep(0.1)
+
+    return count
+
+def collect_all_samples(sensors):
+    """Collect samples from all sensors at once, one thread per sensor"""
+    with ThreadPoolExecutor(max_workers=len(sensors)) as executor:
+        return list(executor.map(collect_samples, sensors))
+
 def calibrate_zero(sensors):
-    """Stage 1: Zero calibration (tare) - record baseline readings"""
+    """Stage 1: Zero calibration (tare) - record baseline readings
+
+    Returns True if every sensor produced a valid offset.
+    """
     print("\n" + "="*60)
     print("STAGE 1: ZERO CALIBRATION (TARE)")
     print("="*60)
@@ -50,27 +86,27 @@ def calibrate_zero(sensors):
 
     print(f"\nTaking {SAMPLES} readings from each sensor...")
 
-    for sensor in sensors:
-        readings = []
-        print(f"\nCalibrating {sensor['name']}...")
+    counts = collect_all_samples(sensors)
+    ok = True
 
-        for i in range(SAMPLES):
-            reading = sensor['hx'].get_raw_data_mean()
-            if reading:
-                readings.append(reading)
-                print(f"  Reading {i+1}/{SAMPLES}: {reading}")
-            time.sleep(0.1)
+    for sensor, count in zip(sensors, counts):
+        samples = sensor['samples']
+        print(f"\n{sensor['name']}:")
 
-        if readings:
-            sensor['offset'] = sum(readings) / len(readings)
+        if count:
+            sensor['offset'] = float(samples[:count].mean())
             print(f"  âœ“ Average offset: {sensor['offset']:.2f}")
         else:
             print(f"  âœ— ERROR: No valid readings from {sensor['name']}")
+            ok = False
 
-    return sensors
+    return ok
 
 def calibrate_scale(sensors, known_weight_grams):
-    """Stage 2: Scale calibration - calculate conversion factors"""
+    """Stage 2: Scale calibration - calculate conversion factors
+
+    Returns True if every sensor produced a usable (finite, non-zero) scale.
+    """
     print("\n" + "="*60)
     print("STAGE 2: SCALE FACTOR CALIBRATION")
     print("="*60)
@@ -79,30 +115,35 @@ def calibrate_scale(sensors, known_weight_grams):
 
     print(f"\nTaking {SAMPLES} readings from each sensor...")
 
-    for sensor in sensors:
-        readings = []
-        print(f"\nCalibrating {sensor['name']}...")
+    counts = collect_all_samples(sensors)
+    ok = True
 
-        for i in range(SAMPLES):
-            reading = sensor['hx'].get_raw_data_mean()
-            if reading:
-                readings.append(reading)
-                print(f"  Reading {i+1}/{SAMPLES}: {reading}")
-            time.sleep(0.1)
+    for sensor, count in zip(sensors, counts):
+        samples = sensor['samples']
+        print(f"\n{sensor['name']}:")
 
-        if readings:
-            avg_reading = sum(readings) / len(readings)
+        if count:
+            avg_reading = float(samples[:count].mean())
             # Calculate scale factor: (reading - offset) / known_weight
             sensor['scale'] = (avg_reading - sensor['offset']) / known_weight_grams
             print(f"  âœ“ Average reading: {avg_reading:.2f}")
-            print(f"  âœ“ Scale factor: {sensor['scale']:.6f}")
+            if sensor['scale'] == 0 or not math.isfinite(sensor['scale']):
+                print(f"  âœ— ERROR: Unusable scale factor {sensor['scale']} for {sensor['name']}")
+                ok = False
+            else:
+                print(f"  âœ“ Scale factor: {sensor['scale']:.6f}")
         else:
             print(f"  âœ— ERROR: No valid readings from {sensor['name']}")
+            ok = False
 
-    return sensors
+    return ok
+
+def save_calibration(sensors, complete, filename='calibration_values.txt', binary_filename=CALIBRATION_FILE):
+    """Save calibration values to a text file for reference and a binary file for the scale
 
-def save_calibration(sensors, filename='calibration_values.txt'):
-    """Save calibration values to file"""
+    The binary file is only written when calibration is complete, since the weighing
+    machine loads it automatically. Returns True if it was written.
+    """
     print("\n" + "="*60)
     print("SAVING CALIBRATION VALUES")
     print("="*60)
@@ -117,11 +158,29 @@ def save_calibration(sensors, filename='calibration_values.txt'):
             f.write(f"SCALE_{i+1} = {sensor['scale']:.6f}\n\n")
 
     print(f"\nâœ“ Calibration values saved to '{filename}'")
-    print("\nCopy these values to your weighing_machine.py:")
+
+    # Never hand the scale a partial or degenerate calibration
+    usable = complete and all(
+        math.isfinite(sensor['offset']) and math.isfinite(sensor['scale']) and sensor['scale'] != 0
+        for sensor in sensors
+    )
+    if not usable:
+        print(f"âœ— Calibration incomplete - '{binary_filename}' NOT written.")
+        print("  Fix the sensors reported above and run calibration again.")
+        return False
+
+    # One [offset, scale] row per sensor, loaded directly by the weighing machine
+    np.save(binary_filename, np.array([[sensor['offset'], sensor['scale']] for sensor in sensors],
+                                      dtype=np.float64))
+    print(f"âœ“ Calibration data saved to '{binary_filename}'")
+
+    print(f"\nThe weighing machine loads '{binary_filename}' automatically.")
+    print("To hardcode the values instead, copy them to your weighing_machine.py:")
     print("\nCALIBRATION = [")
     for sensor in sensors:
         print(f"    {{'offset': {sensor['offset']:.2f}, 'scale': {sensor['scale']:.6f}}},  # {sensor['name']}")
     print("]\n")
+    return True
 
 def main():
     """Main calibration routine"""
@@ -137,22 +196,26 @@ def main():
         print("âœ“ All sensors initialized")
 
         # Stage 1: Zero calibration
-        sensors = calibrate_zero(sensors)
+        zero_ok = calibrate_zero(sensors)
 
         # Stage 2: Scale calibration
         print("\nEnter the known weight in grams (e.g., 1000 for 1kg):")
         known_weight = float(input("Known weight (grams): "))
-        sensors = calibrate_scale(sensors, known_weight)
+        scale_ok = calibrate_scale(sensors, known_weight)
 
         # Save calibration values
-        save_calibration(sensors)
+        if not save_calibration(sensors, complete=zero_ok and scale_ok):
+            print("\n" + "="*60)
+            print("CALIBRATION FAILED")
+            print("="*60)
+            return
 
         print("\n" + "="*60)
         print("CALIBRATION COMPLETE!")
         print("="*60)
         print("\nNext steps:")
-        print("1. Update CALIBRATION array in weighing_machine.py")
-        print("2. Run weighing_machine.py to test the scale")
+        print("1. Run weighing_machine.py from this directory to test the scale")
+        print(f"2. Keep {CALIBRATION_FILE} alongside the scripts")
         print("\n")
 
     except KeyboardInterrupt:
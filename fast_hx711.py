@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+fast_hx711.py - HX711 driver with direct GPIO register access
+Clocks the 24 data bits by reading and writing the BCM283x GPIO registers through
+a memory map of /dev/gpiomem instead of going through RPi.GPIO for every pin toggle.
+Falls back to the stock hx711 implementation when /dev/gpiomem is not available.
+"""
+
+import mmap
+import threading
+import time
+import RPi.GPIO as GPIO
+from hx711 import HX711
+
+# ===========================
+# GPIO REGISTER MAP
+# ===========================
+
+GPIOMEM_PATH = '/dev/gpiomem'
+GPIOMEM_SIZE = 4096
+
+# Register indices (32-bit words) from the BCM2835 GPIO register map
+GPSET0 = 0x1C // 4  # Write 1 to drive pin high
+GPCLR0 = 0x28 // 4  # Write 1 to drive pin low
+GPLEV0 = 0x34 // 4  # Current pin level
+
+# Extra SCK pulses after the 24 data bits select the channel and gain for the
+# next conversion: channel A at gain 128 or 64, channel B is fixed at gain 32
+CHANNEL_A_GAIN_PULSES = {128: 1, 64: 3}
+CHANNEL_B_PULSES = 2
+
+# SCK held high this long (seconds) powers the HX711 down and corrupts the sample
+SCK_MAX_HIGH = 0.00006
+
+# Maximum time to wait for DOUT to signal data ready (seconds)
+READY_TIMEOUT = 0.2
+
+_registers = None
+
+def _gpio_registers():
+    """Map the GPIO register block once and share it between all sensors"""
+    global _registers
+    if _registers is None:
+        with open(GPIOMEM_PATH, 'r+b') as f:
+            mem = mmap.mmap(f.fileno(), GPIOMEM_SIZE)
+        _registers = memoryview(mem).cast('I')
+    return _registers
+
+# ===========================
+# FAST HX711 DRIVER
+# ===========================
+
+class FastHX711(HX711):
+    """HX711 that bit-bangs samples through the memory-mapped GPIO registers"""
+
+    def __init__(self, dout_pin, pd_sck_pin, gain_channel_A=128, select_channel='A'):
+        super().__init__(dout_pin=dout_pin, pd_sck_pin=pd_sck_pin,
+                         gain_channel_A=gain_channel_A, select_channel=select_channel)
+        self._dout_mask = 1 << dout_pin
+        self._sck_mask = 1 << pd_sck_pin
+        if select_channel == 'B':
+            self._gain_pulses = CHANNEL_B_PULSES
+        else:
+            self._gain_pulses = CHANNEL_A_GAIN_PULSES[gain_channel_A]
+
+        try:
+            self._regs = _gpio_registers()
+        except OSError:
+            self._regs = None
+
+        # DOUT falls when a conversion is ready. RPi.GPIO runs event callbacks
+        # from its single poll thread, so unlike concurrent wait_for_edge calls
+        # this is safe with every sensor waiting on its own thread.
+        self._ready = threading.Event()
+        if self._regs is not None:
+            GPIO.add_event_detect(dout_pin, GPIO.FALLING, callback=self._on_data_ready)
+
+    def _on_data_ready(self, channel):
+        """Edge callback: wake the thread waiting for this sensor's sample"""
+        self._ready.set()
+
+    def _read(self):
+        """Read one signed 24-bit sample, or False if the HX711 is not ready"""
+        if self._regs is None:
+            return super()._read()
+
+        regs = self._regs
+        dout_mask = self._dout_mask
+        sck_mask = self._sck_mask
+
+        # Block until the data-ready edge. The level is checked before every
+        # wait, which covers an edge that fell before we started waiting and
+        # stale events left by data bits toggling DOUT during the last readout.
+        regs[GPCLR0] = sck_mask
+        deadline = time.monotonic() + READY_TIMEOUT
+        while regs[GPLEV0] & dout_mask:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            self._ready.wait(remaining)
+            self._ready.clear()
+
+        # GPSET0/GPCLR0 only affect the bits written, so sensors on other
+        # threads can be clocked at the same time without a lock. A thread
+        # switch mid-pulse can still hold SCK high too long, so time each pulse.
+        perf_counter = time.perf_counter
+        data = 0
+        for _ in range(24):
+            start = perf_counter()
+            regs[GPSET0] = sck_mask
+            regs[GPCLR0] = sck_mask
+            if perf_counter() - start >= SCK_MAX_HIGH:
+                return False
+            data = (data << 1) | (1 if regs[GPLEV0] & dout_mask else 0)
+
+        for _ in range(self._gain_pulses):
+            start = perf_counter()
+            regs[GPSET0] = sck_mask
+            regs[GPCLR0] = sck_mask
+            if perf_counter() - start >= SCK_MAX_HIGH:
+                return False
+
+        # Falling data bits set the event too; drop those before the next wait
+        self._ready.clear()
+
+        # Saturated codes mean the input is out of range
+        if data == 0x7FFFFF or data == 0x800000:
+            return False
+
+        # Convert from 24-bit two's complement
+        if data & 0x800000:
+            data -= 0x1000000
+        return data
+
+    def read_raw(self):
+        """Read a single unfiltered sample, or False if the HX711 is not ready"""
+        return self._read()
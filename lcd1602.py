@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+lcd1602.py - LCD1602 I2C Display Driver
+Driver for an HD44780-based LCD1602 behind a PCF8574 I2C backpack, shared by
+weighing_machine.py and weighing_machine_webhook.py.
+"""
+
+import time
+import smbus2
+
+class LCD1602:
+    """Driver for LCD1602 with I2C interface"""
+
+    # LCD Commands
+    LCD_CLEAR = 0x01
+    LCD_HOME = 0x02
+    LCD_ENTRY_MODE = 0x04
+    LCD_DISPLAY_CONTROL = 0x08
+    LCD_FUNCTION_SET = 0x20
+    LCD_SET_DDRAM = 0x80
+
+    # Flags
+    LCD_DISPLAY_ON = 0x04
+    LCD_CURSOR_OFF = 0x00
+    LCD_BLINK_OFF = 0x00
+    LCD_2LINE = 0x08
+    LCD_5x8DOTS = 0x00
+    LCD_BACKLIGHT = 0x08
+
+    # Enable bit
+    ENABLE = 0b00000100
+
+    # High and low nibble of every byte value, shifted into the data bits
+    _NIB_HI = tuple(b & 0xF0 for b in range(256))
+    _NIB_LO = tuple((b << 4) & 0xF0 for b in range(256))
+
+    def __init__(self, address=0x27, bus=1):
+        """Initialize LCD"""
+        self.address = address
+        self.bus = smbus2.SMBus(bus)
+        self.backlight = self.LCD_BACKLIGHT
+
+        # Initialize display
+        time.sleep(0.05)
+        self._write_four_bits(0x03 << 4)
+        time.sleep(0.005)
+        self._write_four_bits(0x03 << 4)
+        time.sleep(0.001)
+        self._write_four_bits(0x03 << 4)
+        self._write_four_bits(0x02 << 4)
+
+        # Function set: 4-bit mode, 2 lines, 5x8 dots
+        self._write_byte(self.LCD_FUNCTION_SET | self.LCD_2LINE | self.LCD_5x8DOTS, 0)
+
+        # Display control: display on, cursor off, blink off
+        self._write_byte(self.LCD_DISPLAY_CONTROL | self.LCD_DISPLAY_ON | 
+                        self.LCD_CURSOR_OFF | self.LCD_BLINK_OFF, 0)
+
+        # Clear display
+        self.clear()
+
+        # Entry mode: increment cursor, no shift
+        self._write_byte(self.LCD_ENTRY_MODE | 0x02, 0)
+        time.sleep(0.002)
+
+    def _send(self, data):
+        """Send a sequence of expander bytes as one I2C block transfer"""
+        self.bus.i2c_rdwr(smbus2.i2c_msg.write(self.address, data))
+
+    def _write_four_bits(self, data):
+        """Write 4 bits to I2C, latched by an enable pulse"""
+        # One I2C byte takes ~90us at 100kHz, far above the 450ns E pulse width
+        bits = data | self.backlight
+        self._send([bits, bits | self.ENABLE, bits])
+
+    def _write_byte(self, data, mode):
+        """Write byte in 4-bit mode"""
+        high_bits = mode | self._NIB_HI[data] | self.backlight
+        low_bits = mode | self._NIB_LO[data] | self.backlight
+
+        self._send([high_bits | self.ENABLE, high_bits, low_bits | self.ENABLE, low_bits])
+
+    def clear(self):
+        """Clear display"""
+        self._write_byte(self.LCD_CLEAR, 0)
+        time.sleep(0.002)
+
+    def set_cursor(self, col, row):
+        """Set cursor position (col: 0-15, row: 0-1)"""
+        row_offsets = [0x00, 0x40]
+        self._write_byte(self.LCD_SET_DDRAM | (col + row_offsets[row]), 0)
+
+    def print(self, text, col=0, row=0):
+        """Print text at specified position"""
+        self.set_cursor(col, row)
+        if isinstance(text, str):
+            text = text.encode('ascii', 'replace')
+
+        # Each character is two nibbles, each latched by an E high/low pair;
+        # the whole line goes out as a single I2C block transfer
+        buf = bytearray()
+        for data in text:
+            for nibble in (self._NIB_HI[data], self._NIB_LO[data]):
+                bits = 1 | nibble | self.backlight
+                buf.append(bits | self.ENABLE)
+                buf.append(bits)
+        self._send(buf)
+
+    def backlight_on(self):
+        """Turn backlight on"""
+        self.backlight = self.LCD_BACKLIGHT
+        self._send([self.backlight])
+
+    def backlight_off(self):
+        """Turn backlight off"""
+        self.backlight = 0x00
+        self._send([self.backlight])
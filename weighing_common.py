@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+weighing_common.py - Shared Weighing Machine Core
+Sensor setup, calibration loading, filtered weight reads, idle detection, LCD
+output and console status shared by weighing_machine.py and weighing_machine_webhook.py.
+"""
+
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import RPi.GPIO as GPIO
+from fast_hx711 import FastHX711
+from lcd1602 import LCD1602
+
+def load_calibration(calibration_file, fallback, sensor_count):
+    """Return an array of [offset, scale] rows from calibration_file, or from fallback if missing"""
+    if not os.path.exists(calibration_file):
+        print(f"  â„¹ {calibration_file} not found, using CALIBRATION values")
+        return np.array([[c['offset'], c['scale']] for c in fallback], dtype=np.float64)
+
+    calibration = np.load(calibration_file)
+    if calibration.shape != (sensor_count, 2):
+        raise ValueError(f"{calibration_file} has shape {calibration.shape}, "
+                         f"expected ({sensor_count}, 2); re-run calibration.py")
+    if not np.isfinite(calibration).all() or (calibration[:, 1] == 0).any():
+        raise ValueError(f"{calibration_file} has a non-finite value or zero scale; "
+                         f"re-run calibration.py")
+    print(f"  âœ“ Calibration loaded from {calibration_file}")
+    return calibration
+
+class WeighingMachineBase:
+    """Hardware handling and main-loop steps shared by the weighing machine controllers"""
+
+    def __init__(self):
+        self.sensors = []
+        self.lcd = None
+        self._pool = None
+        self._idle = False  # Last full read showed an empty platform
+        self._last_total = 0.0
+        self._last_weights = None
+        self._lcd_cache = [None, None]  # Last text written to each LCD row
+        self._weight_line = bytearray(b"Weight:         ")
+        self._last_printed = None  # Last total written to the console
+        self._last_prefix = None  # Last status prefix written to the console
+        self._status_overwritten = False  # Another thread printed over the status line
+
+    def initialize_sensors(self, configs, calibration_file, fallback, filter_depth):
+        """Set up the HX711 sensors, calibration arrays, median filter and read pool"""
+        for config in configs:
+            hx = FastHX711(dout_pin=config['dout'], pd_sck_pin=config['pd_sck'])
+            hx.reset()
+
+            self.sensors.append({
+                'name': config['name'],
+                'hx': hx
+            })
+            print(f"  âœ“ {config['name']} initialized")
+
+        # Calibration stored as arrays so all sensors are corrected in one step
+        calibration = load_calibration(calibration_file, fallback, len(self.sensors))
+        self._offsets = calibration[:, 0].copy()
+        self._scales = calibration[:, 1].copy()
+        self._raw = np.empty(len(self.sensors), dtype=np.float64)
+
+        # Ring buffer of recent raw readings, one row per sensor
+        self._filter_depth = filter_depth
+        self._ring = np.empty((len(self.sensors), filter_depth), dtype=np.float64)
+        self._ring_head = 0
+        self._ring_count = 0
+
+        # One worker per HX711 so all four conversions are clocked in parallel
+        self._pool = ThreadPoolExecutor(max_workers=len(self.sensors))
+
+    def initialize_lcd(self, address, bus):
+        """Set up the LCD display"""
+        try:
+            self.lcd = LCD1602(address=address, bus=bus)
+            print(f"  âœ“ LCD initialized at 0x{address:02X}")
+        except Exception as e:
+            print(f"  âœ— LCD initialization failed: {e}")
+            raise
+
+    def read_weight(self):
+        """Read weight from all sensors and return total in grams"""
+        raw_readings = self._pool.map(lambda s: s['hx'].get_raw_data_mean(), self.sensors)
+        self._raw[:] = [np.nan if r is False else r for r in raw_readings]
+        # Failed reads are recorded as zero load
+        np.copyto(self._raw, self._offsets, where=np.isnan(self._raw))
+
+        # Median over the most recent readings rejects single-sample spikes
+        self._ring[:, self._ring_head] = self._raw
+        self._ring_head = (self._ring_head + 1) % self._filter_depth
+        self._ring_count = min(self._ring_count + 1, self._filter_depth)
+        filtered = np.median(self._ring[:, :self._ring_count], axis=1)
+
+        # Apply calibration: weight = (reading - offset) / scale
+        sensor_weights = (filtered - self._offsets) / self._scales
+        total_weight = float(sensor_weights.sum())
+
+        return total_weight, sensor_weights
+
+    def measure(self, idle_threshold):
+        """Return the current total and per-sensor weights, refreshing the display
+
+        While the platform stays empty the full averaged read is skipped and the
+        previous (zero) result is returned with the display left as it is.
+        """
+        if self._idle and self.is_idle(idle_threshold):
+            return self._last_total, self._last_weights
+
+        total_weight, sensor_weights = self.read_weight()
+        self._idle = abs(total_weight) < idle_threshold
+        if self._idle:
+            # The display is frozen while idle, so show an empty
+            # platform as exactly zero rather than a leftover reading
+            total_weight = 0.0
+            sensor_weights[:] = 0.0
+
+        self.update_display(total_weight)
+        self._last_total, self._last_weights = total_weight, sensor_weights
+        return total_weight, sensor_weights
+
+    def is_idle(self, threshold):
+        """Check with a single unaveraged sample per sensor whether the platform is still empty"""
+        raw_readings = list(self._pool.map(lambda s: s['hx'].read_raw(), self.sensors))
+        if all(r is not False for r in raw_readings):
+            self._raw[:] = raw_readings
+            if abs(((self._raw - self._offsets) / self._scales).sum()) < threshold:
+                return True
+
+        # Leaving idle: the filter still holds empty-platform samples from before
+        # the idle spell, which would outvote the new load for several reads
+        self._ring_head = 0
+        self._ring_count = 0
+        return False
+
+    def format_weight_display(self, weight_grams):
+        """Format weight into the reusable LCD line buffer and return it"""
+        if weight_grams < 0:
+            weight_grams = 0  # Don't display negative weights
+
+        # Fixed-point value: tenths of a gram below 1kg, grams (3 decimals of kg) above
+        if weight_grams < 1000:
+            value, decimals, unit = round(weight_grams * 10), 1, b"g"
+        else:
+            value, decimals, unit = round(weight_grams), 3, b"kg"
+
+        digits = decimals + 1
+        limit = 10 ** digits
+        while value >= limit:
+            digits += 1
+            limit *= 10
+
+        line = self._weight_line
+        start = 8  # After "Weight: "
+        end = start + digits + 1  # Digits plus decimal point
+        if end + len(unit) > len(line):
+            line[start:] = b"OVERLOAD"
+            return line
+
+        # Fill digits right to left, inserting the decimal point
+        pos = end
+        for d in range(digits):
+            pos -= 1
+            if d == decimals:
+                line[pos] = 0x2E  # '.'
+                pos -= 1
+            line[pos] = 0x30 + value % 10
+            value //= 10
+
+        line[end:end + len(unit)] = unit
+        for pos in range(end + len(unit), len(line)):
+            line[pos] = 0x20  # Pad with spaces
+        return line
+
+    def update_display(self, weight_grams):
+        """Update LCD with current weight"""
+        if self.lcd is None:
+            return
+
+        # Line 1: Title
+        self._print_row(b"Weight Scale    ", row=0)
+
+        # Line 2: Weight value
+        self._print_row(self.format_weight_display(weight_grams), row=1)
+
+    def invalidate_display(self):
+        """Forget cached LCD rows after the screen was written directly"""
+        self._lcd_cache = [None, None]
+
+    def _print_row(self, text, row):
+        """Write a full LCD row, skipping the I2C transfer if it is unchanged"""
+        if text == self._lcd_cache[row]:
+            return
+        self.lcd.print(text, col=0, row=row)
+        # Copy, since the weight line buffer is rewritten in place
+        self._lcd_cache[row] = bytes(text)
+
+    def status_prefix(self):
+        """Bytes shown before the total on the console status line"""
+        return b""
+
+    def status_overwritten(self):
+        """Note that other console output replaced the status line, forcing a redraw"""
+        self._status_overwritten = True
+
+    def print_status(self, total_weight, sensor_weights):
+        """Write the current readings to the console if they changed or were overwritten"""
+        prefix = self.status_prefix()
+        if (not self._status_overwritten and self._last_printed is not None
+                and abs(total_weight - self._last_printed) < 0.1
+                and prefix == self._last_prefix):
+            return
+        self._status_overwritten = False
+        self._last_printed = total_weight
+        self._last_prefix = prefix
+
+        # Format straight to bytes and bypass the text layer's encoding
+        sys.stdout.flush()
+        out = sys.stdout.buffer
+        out.write(b"\r%sTotal: %7.3f kg | Sensors: [%6.1fg, %6.1fg, %6.1fg, %6.1fg]"
+                  % (prefix, total_weight / 1000, *sensor_weights))
+        out.flush()
+
+    def wait_for_tick(self, next_tick, interval):
+        """Sleep until next_tick + interval and return that deadline
+
+        Sleeping to a fixed schedule keeps the loop period from drifting with
+        work time. After an overrun the schedule restarts from now.
+        """
+        next_tick += interval
+        delay = next_tick - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+            return next_tick
+        return time.monotonic()
+
+    def cleanup(self):
+        """Clean up resources"""
+        if self.lcd:
+            self.lcd.clear()
+            self.lcd.print("System", col=0, row=0)
+            self.lcd.print("Shutdown", col=0, row=1)
+            time.sleep(1)
+            self.lcd.backlight_off()
+
+        if self._pool:
+            self._pool.shutdown()
+
+        GPIO.cleanup()
+        print("Cleanup complete.")